@@ -1,8 +1,11 @@
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
 from flask_mail import Mail
+from application.rate_limit import TokenBucketLimiter
+from application.mail_queue import MailQueue
 import os
 
 
@@ -15,12 +18,37 @@ app.config['MAIL_PORT'] = 587
 app.config['MAIL_USE_TLS'] = True
 app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
 app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
+# Token-bucket limits as (capacity, seconds to refill) per endpoint and scope. The IP scope is
+# looser because a school NAT or proxy puts many teachers behind one address; the email scope
+# is kept moderate so that nobody can lock a named user out for long.
+app.config['RATELIMIT_LIMITS'] = {
+    'login': {'ip': (30, 60), 'email': (10, 300)},
+    'register': {'ip': (10, 600), 'email': (3, 600)},
+    'reset_request': {'ip': (10, 900), 'email': (3, 900)},
+    'reset_token': {'ip': (10, 900)},
+}
+# Set RATELIMIT_ENABLED=0 to turn the limiter off, e.g. for load tests
+if os.getenv('RATELIMIT_ENABLED', '1') == '0':
+    app.config['RATELIMIT_LIMITS'] = {}
+# Optional SQLite file so that every worker shares the same buckets
+app.config['RATELIMIT_STORAGE'] = os.getenv('RATELIMIT_STORAGE')
+# Number of reverse proxies in front of the app whose X-Forwarded-For header is trusted
+app.config['PROXY_FIX_X_FOR'] = int(os.getenv('PROXY_FIX_X_FOR', 0))
+# Threads used to deliver mail outside of the request that triggered it, and how many
+# messages may be waiting or in flight before new ones are refused
+app.config['MAIL_WORKERS'] = int(os.getenv('MAIL_WORKERS', 4))
+app.config['MAIL_QUEUE_SIZE'] = int(os.getenv('MAIL_QUEUE_SIZE', 100))
+
+if app.config['PROXY_FIX_X_FOR']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
 
 
 mail = Mail(app)
 db = SQLAlchemy(app)
 bcrypt = Bcrypt(app)
 login_manager = LoginManager(app)
+limiter = TokenBucketLimiter(app)
+mail_queue = MailQueue(app)
 
 
 from application import routes
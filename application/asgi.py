@@ -0,0 +1,72 @@
+import asyncio
+
+
+class BufferedASGI:
+    """
+    ASGI middleware that shields the WSGI thread pool from slow clients.
+    The whole request body is read on the event loop, within `body_timeout` seconds and
+    up to `max_body` bytes, before the request is handed to the wrapped application, and
+    the response is collected in memory and written to the client only once the
+    application has finished. A worker thread is therefore busy only while the view runs,
+    not while a client uploads or downloads slowly.
+
+    Attributes:
+        app (callable): The wrapped ASGI application, e.g. an a2wsgi WSGIMiddleware.
+        max_body (int): Largest request body accepted, in bytes; larger bodies get a 413.
+        body_timeout (float): Seconds allowed to receive the whole body; slower clients get a 408.
+    """
+
+    def __init__(self, app, max_body, body_timeout):
+        self.app = app
+        self.max_body = max_body
+        self.body_timeout = body_timeout
+
+    @staticmethod
+    async def _reply(send, status):
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'text/plain'), (b'connection', b'close')]})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def _read_body(self, receive):
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body:
+                raise ValueError('request body too large')
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        try:
+            body = await asyncio.wait_for(self._read_body(receive), self.body_timeout)
+        except asyncio.TimeoutError:
+            return await self._reply(send, 408)
+        except ValueError:
+            return await self._reply(send, 413)
+        if body is None:
+            return
+
+        replayed = False
+
+        async def buffered_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            return await receive()
+
+        response = []
+
+        async def buffered_send(message):
+            response.append(message)
+
+        await self.app(scope, buffered_receive, buffered_send)
+        for message in response:
+            await send(message)
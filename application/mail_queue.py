@@ -0,0 +1,80 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+
+
+class MailQueue:
+    """
+    Bounded queue delivering mail on worker threads, outside of the request that triggered it.
+    At most MAIL_QUEUE_SIZE messages can be waiting or in flight; further messages are
+    refused so that a burst of requests cannot build an unbounded backlog in memory.
+
+    Attributes:
+        counts (Counter): Number of messages "sent", "failed" and "refused".
+
+    Methods:
+        init_app(app): Read the queue configuration from a Flask app.
+        submit(msg): Queue a message for delivery.
+        stats(): Return a copy of the delivery counters.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.counts = Counter()
+        self._executor = None
+        self._slots = None
+        self._lock = Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Read the queue configuration from the application.
+        Parameters:
+            app (Flask): The application holding the MAIL_WORKERS and MAIL_QUEUE_SIZE settings.
+        Returns:
+            None
+        """
+        self.app = app
+        self._executor = ThreadPoolExecutor(max_workers=app.config['MAIL_WORKERS'])
+        self._slots = BoundedSemaphore(app.config['MAIL_QUEUE_SIZE'])
+
+    def _count(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def _deliver(self, msg):
+        try:
+            with self.app.app_context():
+                self.app.extensions['mail'].send(msg)
+        except Exception:
+            self._count('failed')
+            self.app.logger.exception("Failed to send email to %s (%d failures so far)",
+                                      msg.recipients, self.counts['failed'])
+            raise
+        finally:
+            self._slots.release()
+        self._count('sent')
+
+    def submit(self, msg):
+        """
+        Queue a message for delivery.
+        Parameters:
+            msg (Message): The message to send.
+        Returns:
+            Future or None: The pending delivery, or None if the queue is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            self._count('refused')
+            self.app.logger.warning("Mail queue full, refused email to %s", msg.recipients)
+            return None
+        return self._executor.submit(self._deliver, msg)
+
+    def stats(self):
+        """
+        Return the delivery counters.
+        Returns:
+            dict: Number of messages keyed by outcome.
+        """
+        with self._lock:
+            return dict(self.counts)
@@ -1,6 +1,6 @@
-from application import db, login_manager, app
+from application import db, login_manager
 from uuid import uuid4
-from itsdangerous import TimedJSONWebSignatureSerializer as Serialiser
+from application import reset_tokens
 from datetime import datetime
 from flask_login import UserMixin
 
@@ -39,30 +39,32 @@ class User(db.Model, UserMixin):
     
     def get_reset_token(self, expires_sec=1800):
         """
-        Generate a reset token for the current user.
+        Generate a single-use reset token for the current user.
         Parameters:
             expires_sec (int): The number of seconds until the reset token expires. Default is 1800 seconds.
         Returns:
             str: The reset token as a string.
         """
-        s = Serialiser(app.config['SECRET_KEY'], expires_sec)
-        return s.dumps({"user_id": self.id}).decode('utf-8')
+        return reset_tokens.issue_token(self, expires_sec)
     
     @staticmethod
     def verify_token(token):
         """
         Verify a token and return the corresponding user.
+        Invalid or expired tokens are rejected before querying the database, and tokens
+        issued before the user's last password change no longer match.
         Parameters:
             token (str): The token to be verified.
         Returns:
             User or None: The corresponding user if the token is valid, or None if the token is invalid.
         """
-        s = Serialiser(app.config['SECRET_KEY'])
-        try:
-            user_id = s.loads(token)['user_id']
-        except:
+        payload = reset_tokens.load_token(token)
+        if payload is None:
             return None
-        return User.query.get(user_id)
+        user = User.query.get(payload['user_id'])
+        if not reset_tokens.matches_user(payload, user):
+            return None
+        return user
         
 
     def __repr__(self):
@@ -0,0 +1,196 @@
+import sqlite3
+import time
+from collections import Counter
+from functools import wraps
+from threading import Lock
+from flask import request, abort, current_app
+
+# Longest valid email address; longer submissions are truncated before being used as a key
+MAX_EMAIL_KEY_LENGTH = 254
+
+
+class TokenBucketLimiter:
+    """
+    Token-bucket rate limiter used to protect the expensive authentication routes.
+    Every bucket holds up to `capacity` tokens and refills at `capacity / period` tokens
+    per second. Buckets live in process memory unless a SQLite path is given, in which
+    case they are stored in that database so several workers share the same limits.
+    Buckets that have refilled completely are dropped, since a missing bucket is
+    treated as a full one.
+
+    The IP scope is keyed on `request.remote_addr`.
+
+    Attributes:
+        storage (str): Path to the SQLite file holding shared buckets, or None for in-process buckets.
+        limits (dict): (capacity, period) per scope ("ip", "email") for each endpoint.
+        rejected (Counter): Number of rejected requests keyed by (endpoint, scope).
+
+    Methods:
+        init_app(app): Read the limiter configuration from a Flask app.
+        consume(key, capacity, period): Take one token from the bucket identified by key.
+        consume_all(buckets): Take one token from each bucket, or from none of them.
+        limit(endpoint): Decorator rejecting POST requests that exceed the endpoint limits.
+        stats(): Return a copy of the rejection counters.
+    """
+
+    def __init__(self, app=None, sweep_interval=60):
+        self.storage = None
+        self.limits = {}
+        self.rejected = Counter()
+        self.sweep_interval = sweep_interval
+        self._buckets = {}
+        self._last_sweep = 0
+        self._lock = Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Read the limiter configuration from the application.
+        Parameters:
+            app (Flask): The application holding the RATELIMIT_* settings.
+        Returns:
+            None
+        """
+        self.storage = app.config.get('RATELIMIT_STORAGE')
+        self.limits = app.config.get('RATELIMIT_LIMITS', {})
+        if self.storage:
+            conn = self._connect()
+            try:
+                conn.execute('CREATE TABLE IF NOT EXISTS rate_limit_bucket '
+                             '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, '
+                             'full_at REAL NOT NULL)')
+            finally:
+                conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.storage, timeout=5, isolation_level=None)
+
+    @staticmethod
+    def _take(tokens, updated, now, capacity, period):
+        """
+        Refill a bucket up to now and take one token from it.
+        Returns:
+            tuple: (allowed, tokens left, time at which the bucket is full again)
+        """
+        tokens = min(capacity, tokens + (now - updated) * capacity / period)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        return allowed, tokens, now + (capacity - tokens) * period / capacity
+
+    def _sweep_due(self, now):
+        if now - self._last_sweep < self.sweep_interval:
+            return False
+        self._last_sweep = now
+        return True
+
+    def consume(self, key, capacity, period):
+        """
+        Take one token from a bucket.
+        Parameters:
+            key (str): Identifier of the bucket, e.g. "login:ip:127.0.0.1".
+            capacity (int): Maximum number of tokens the bucket can hold.
+            period (float): Number of seconds needed to refill an empty bucket.
+        Returns:
+            bool: True if a token was available, False if the request must be rejected.
+        """
+        return self.consume_all([(key, capacity, period)]) is None
+
+    def consume_all(self, buckets):
+        """
+        Take one token from each of several buckets, or from none of them.
+        Tokens are only taken when every bucket has one available, so a request rejected
+        by one bucket is not charged to the others.
+        Parameters:
+            buckets (list): (key, capacity, period) tuples, as for consume.
+        Returns:
+            int or None: Index of the first bucket without a token, or None if all tokens were taken.
+        """
+        now = time.time()
+        if self.storage:
+            return self._consume_all_shared(buckets, now)
+        with self._lock:
+            if self._sweep_due(now):
+                self._buckets = {k: b for k, b in self._buckets.items() if b[2] > now}
+            states = [self._buckets.get(key, (capacity, now, now))[:2] for key, capacity, period in buckets]
+            taken = self._take_all(buckets, states, now)
+            if isinstance(taken, int):
+                return taken
+            self._buckets.update(taken)
+        return None
+
+    def _take_all(self, buckets, states, now):
+        taken = {}
+        for i, ((key, capacity, period), (tokens, updated)) in enumerate(zip(buckets, states)):
+            allowed, tokens, full_at = self._take(tokens, updated, now, capacity, period)
+            if not allowed:
+                return i
+            taken[key] = (tokens, now, full_at)
+        return taken
+
+    def _consume_all_shared(self, buckets, now):
+        with self._lock:
+            sweep = self._sweep_due(now)
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            if sweep:
+                conn.execute('DELETE FROM rate_limit_bucket WHERE full_at <= ?', (now,))
+            states = []
+            for key, capacity, period in buckets:
+                row = conn.execute('SELECT tokens, updated FROM rate_limit_bucket WHERE key = ?',
+                                   (key,)).fetchone()
+                states.append(row if row else (capacity, now))
+            taken = self._take_all(buckets, states, now)
+            if not isinstance(taken, int):
+                conn.executemany('INSERT OR REPLACE INTO rate_limit_bucket (key, tokens, updated, full_at) '
+                                 'VALUES (?, ?, ?, ?)', [(key, *state) for key, state in taken.items()])
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+        return taken if isinstance(taken, int) else None
+
+    def limit(self, endpoint):
+        """
+        Decorator applying the configured limits of an endpoint to its POST requests.
+        The client IP and the submitted email (when present) each have their own bucket
+        and their own limits; a token is taken from every bucket or from none. The check
+        runs before any form validation, password hashing or database query.
+        Parameters:
+            endpoint (str): Name of the entry in RATELIMIT_LIMITS to apply.
+        Returns:
+            function: The decorated view, aborting with 429 when a bucket is empty.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                limits = self.limits.get(endpoint, {})
+                if request.method == 'POST' and limits:
+                    keys = [('ip', request.remote_addr or 'unknown')]
+                    email = request.form.get('email', '').strip().lower()[:MAX_EMAIL_KEY_LENGTH]
+                    if email:
+                        keys.append(('email', email))
+                    keys = [(scope, value) for scope, value in keys if scope in limits]
+                    rejected = self.consume_all([(f'{endpoint}:{scope}:{value}', *limits[scope])
+                                                 for scope, value in keys])
+                    if rejected is not None:
+                        scope = keys[rejected][0]
+                        with self._lock:
+                            self.rejected[(endpoint, scope)] += 1
+                            count = self.rejected[(endpoint, scope)]
+                        current_app.logger.warning("Rate limit hit on %s by %s (%d rejected so far)",
+                                                   endpoint, scope, count)
+                        abort(429)
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        """
+        Return the rejection counters.
+        Returns:
+            dict: Number of rejected requests keyed by "endpoint:scope".
+        """
+        with self._lock:
+            return {f'{endpoint}:{scope}': count for (endpoint, scope), count in self.rejected.items()}
@@ -0,0 +1,79 @@
+import hashlib
+import hmac
+from functools import lru_cache
+from itsdangerous import TimedJSONWebSignatureSerializer as Serialiser
+from application import app
+
+
+@lru_cache(maxsize=8)
+def _serialiser(secret_key, expires_sec):
+    return Serialiser(secret_key, expires_sec)
+
+
+def get_serialiser(expires_sec=1800):
+    """
+    Return the serialiser used for password reset tokens.
+    Serialisers are cached per secret key and expiry instead of being built on every call.
+    Parameters:
+        expires_sec (int): The number of seconds until issued tokens expire.
+    Returns:
+        Serialiser: The cached timed serialiser.
+    """
+    return _serialiser(app.config['SECRET_KEY'], expires_sec)
+
+
+def password_fingerprint(password_hash):
+    """
+    Compute a short fingerprint of a user's password hash, keyed with the secret key
+    so that the token carries nothing that can be checked against the stored hash.
+    Parameters:
+        password_hash (str): The bcrypt hash stored on the user.
+    Returns:
+        str: A hex digest that changes whenever the password changes.
+    """
+    key = app.config['SECRET_KEY'].encode('utf-8')
+    return hmac.new(key, password_hash.encode('utf-8'), hashlib.sha256).hexdigest()[:32]
+
+
+def issue_token(user, expires_sec=1800):
+    """
+    Issue a password reset token for a user.
+    The token embeds a fingerprint of the current password hash, so it stops
+    working as soon as the password is reset.
+    Parameters:
+        user (User): The user requesting the reset.
+        expires_sec (int): The number of seconds until the token expires.
+    Returns:
+        str: The reset token.
+    """
+    payload = {"user_id": user.id, "pwd": password_fingerprint(user.password)}
+    return get_serialiser(expires_sec).dumps(payload).decode('utf-8')
+
+
+def load_token(token):
+    """
+    Check the signature and expiry of a reset token without touching the database.
+    Parameters:
+        token (str): The token to load.
+    Returns:
+        dict or None: The token payload, or None if the token is invalid or expired.
+    """
+    try:
+        payload = get_serialiser().loads(token)
+    except Exception:
+        return None
+    if not isinstance(payload, dict) or 'user_id' not in payload or 'pwd' not in payload:
+        return None
+    return payload
+
+
+def matches_user(payload, user):
+    """
+    Check that a loaded token was issued for the user's current password.
+    Parameters:
+        payload (dict): The payload returned by load_token.
+        user (User or None): The user the token refers to.
+    Returns:
+        bool: True if the token is still valid for the user.
+    """
+    return user is not None and hmac.compare_digest(payload['pwd'], password_fingerprint(user.password))
@@ -2,12 +2,12 @@ import secrets
 import os
 from PIL import Image
 from flask import render_template, redirect, url_for, flash, request, abort
-from application import app, bcrypt, db, mail
+from application import app, bcrypt, db, limiter, mail_queue
 from application.forms import (RegistrationForm, LoginForm,
                                UpdateAccountForm, RequestForm, ResetPasswordForm, RequestNewPasswordForm)
 from application.models_database import User, Request
 from flask_login import login_user, current_user, logout_user, login_required
-from flask_mail import Message, Mail
+from flask_mail import Message
 
 
 @app.route('/')
@@ -49,6 +49,17 @@ def home():
     else:
         return redirect(url_for('login'))
 
+@app.errorhandler(429)
+def too_many_requests(error):
+    """
+    Render the rate limit page.
+    Parameters:
+        error (TooManyRequests): The error raised by the rate limiter.
+    Returns:
+        The rendered too_many_requests.html template with a 429 status.
+    """
+    return render_template('too_many_requests.html', title='Too Many Requests'), 429
+
 @app.route('/about')
 def about():
     """
@@ -60,6 +71,7 @@ def about():
 
 
 @app.route('/register', methods=['POST', 'GET'])
+@limiter.limit('register')
 def register():
     """
     Handle user registration.
@@ -88,6 +100,7 @@ def register():
 
 
 @app.route('/login', methods=['POST', 'GET'])
+@limiter.limit('login')
 def login():
     """
     Handle user login.
@@ -295,12 +308,13 @@ def delete_request(request_id):
 def send_email_message(user):
     """
     Sends an email message to the specified user.
+    The message is built within the request and handed to the mail queue,
+    so the response does not wait on the SMTP server.
     Parameters:
         user (User): The user to send the email to.
     Returns:
-        None
+        Future or None: The pending delivery of the message, or None if the mail queue is full.
     """
-    mail = Mail(app)
     token = user.get_reset_token()
     msg_title = "Password Reset Request"
     msg = Message(msg_title, sender='teachertrek2023@gmail.com', recipients=[user.email])
@@ -308,22 +322,26 @@ def send_email_message(user):
     
 If you did not request for a password reset please ignore this email
 '''
-    mail.send(msg)
+    return mail_queue.submit(msg)
 
 @app.route('/reset_password', methods=['POST', 'GET'])
+@limiter.limit('reset_request')
 def reset_request():
     if current_user.is_authenticated:
         return redirect(url_for('home'))
     form = RequestNewPasswordForm()
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data).first()
-        send_email_message(user)
-        flash("An email on how to reset your password has been sent", 'info')
+        if send_email_message(user) is None:
+            flash("We could not send the reset email right now, please try again in a few minutes", 'danger')
+            return redirect(url_for('reset_request'))
+        flash("An email on how to reset your password is on its way", 'info')
         return redirect(url_for('login'))
     return render_template('reset_request.html', title='Reset Password', form=form)
 
 
 @app.route('/reset_password/<token>', methods=['POST', 'GET'])
+@limiter.limit('reset_token')
 def reset_token(token):
     if current_user.is_authenticated:
         return redirect(url_for('home'))
@@ -0,0 +1,174 @@
+"""
+Simple load test used to compare the sync (run_app.py) and ASGI (run_asgi.py) serving modes.
+
+Usage:
+    python load_test.py http://127.0.0.1:5000/about --mode slow-read --clients 200 --requests 20 --delay 0.5
+    python load_test.py http://127.0.0.1:5000/login --mode slow-body --email teacher@example.com --password secret
+
+Every client opens its own connection per request and behaves like a slow client:
+    slow-headers  sends a GET request line, waits `delay` seconds, then sends the headers
+    slow-body     POSTs the login form, with its body dribbled in over `delay` seconds
+    slow-read     sends a GET at full speed, then reads the response in small chunks over `delay` seconds
+Run each mode once against each server and compare the reported throughput, latency and statuses.
+In slow-body mode each client first fetches the form to get a session cookie and CSRF token, so
+the POST goes through the real login view. Start the servers with RATELIMIT_ENABLED=0, or the
+login rate limit answers almost every POST with a 429, and pass the credentials of an existing
+account to include the bcrypt check.
+"""
+import argparse
+import http.client
+import re
+import socket
+import statistics
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit, urlencode
+
+BODY_CHUNKS = 8
+READ_CHUNK = 512
+
+
+def fetch_form(url, email, password):
+    """
+    Fetch the login form once to get a session cookie and CSRF token for slow-body POSTs.
+    Parameters:
+        url (SplitResult): The URL of the form.
+        email (str): The email to submit.
+        password (str): The password to submit.
+    Returns:
+        tuple: (Cookie header value, urlencoded form body)
+    """
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+    try:
+        conn.request('GET', url.path or '/')
+        response = conn.getresponse()
+        html = response.read().decode('utf-8', 'replace')
+        cookie = (response.getheader('Set-Cookie') or '').split(';', 1)[0]
+    finally:
+        conn.close()
+    match = re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', html)
+    fields = {'email': email, 'password': password, 'submit': 'Login'}
+    if match:
+        fields['csrf_token'] = match.group(1)
+    return cookie, urlencode(fields).encode()
+
+
+def send_request(sock, url, mode, delay, form=None):
+    """
+    Send one request in the style of the given mode.
+    Parameters:
+        sock (socket): The connected socket.
+        url (SplitResult): The target URL.
+        mode (str): One of "slow-headers", "slow-body" or "slow-read".
+        delay (float): Seconds the slow part of the request takes.
+        form (tuple): The (cookie, body) pair returned by fetch_form, for slow-body mode.
+    Returns:
+        None
+    """
+    path = url.path or '/'
+    headers = f'Host: {url.netloc}\r\nConnection: close\r\n'
+    if mode == 'slow-body':
+        cookie, body = form
+        sock.sendall(f'POST {path} HTTP/1.1\r\n{headers}Cookie: {cookie}\r\n'
+                     f'Content-Type: application/x-www-form-urlencoded\r\n'
+                     f'Content-Length: {len(body)}\r\n\r\n'.encode())
+        step = -(-len(body) // BODY_CHUNKS)
+        for i in range(0, len(body), step):
+            time.sleep(delay / BODY_CHUNKS)
+            sock.sendall(body[i:i + step])
+    elif mode == 'slow-headers':
+        sock.sendall(f'GET {path} HTTP/1.1\r\n'.encode())
+        time.sleep(delay)
+        sock.sendall(f'{headers}\r\n'.encode())
+    else:
+        sock.sendall(f'GET {path} HTTP/1.1\r\n{headers}\r\n'.encode())
+
+
+def read_response(sock, mode, delay):
+    """
+    Read a whole response, slowly in slow-read mode.
+    Parameters:
+        sock (socket): The connected socket.
+        mode (str): The load test mode.
+        delay (float): Seconds spread over the chunked reads in slow-read mode.
+    Returns:
+        bytes: The HTTP status code.
+    """
+    data = sock.recv(READ_CHUNK)
+    status = data.split(b' ', 2)[1]
+    while data:
+        if mode == 'slow-read':
+            time.sleep(delay / 10)
+        data = sock.recv(READ_CHUNK)
+    return status
+
+
+def run_client(url, mode, n_requests, delay, credentials, latencies, statuses, errors):
+    """
+    Send n_requests requests to url in the style of the given mode.
+    Parameters:
+        url (SplitResult): The target URL.
+        mode (str): The load test mode.
+        n_requests (int): Number of requests to send.
+        delay (float): Seconds the slow part of each request takes.
+        credentials (tuple): The (email, password) submitted in slow-body mode.
+        latencies (list): Receives the total time of every completed request.
+        statuses (Counter): Counts the HTTP status of every completed request.
+        errors (list): Receives the error of every failed request.
+    Returns:
+        None
+    """
+    try:
+        form = fetch_form(url, *credentials) if mode == 'slow-body' else None
+    except Exception as exc:
+        errors.append(exc)
+        return
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        try:
+            with socket.create_connection((url.hostname, url.port or 80), timeout=60) as sock:
+                send_request(sock, url, mode, delay, form)
+                status = read_response(sock, mode, delay)
+            latencies.append(time.perf_counter() - start)
+            statuses[status.decode()] += 1
+        except Exception as exc:
+            errors.append(exc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('--mode', choices=['slow-headers', 'slow-body', 'slow-read'], default='slow-read')
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=10)
+    parser.add_argument('--delay', type=float, default=0.5)
+    parser.add_argument('--email', default='load@test.com')
+    parser.add_argument('--password', default='loadtest')
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    latencies, statuses, errors = [], Counter(), []
+    threads = [threading.Thread(target=run_client,
+                                args=(url, args.mode, args.requests, args.delay, (args.email, args.password),
+                                      latencies, statuses, errors))
+               for _ in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f'{args.mode}: {len(latencies)} completed, {len(errors)} errors in {elapsed:.2f}s '
+          f'({len(latencies) / elapsed:.1f} req/s)')
+    print('statuses: ' + ', '.join(f'{status}={count}' for status, count in sorted(statuses.items())))
+    if latencies:
+        latencies.sort()
+        print(f'latency p50 {statistics.median(latencies) * 1000:.1f}ms, '
+              f'p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms, '
+              f'max {latencies[-1] * 1000:.1f}ms (includes the {args.delay}s client delay)')
+
+
+if __name__ == '__main__':
+    main()
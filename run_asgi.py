@@ -0,0 +1,14 @@
+import os
+from a2wsgi import WSGIMiddleware
+from application import app
+from application.asgi import BufferedASGI
+
+# ASGI entry point, e.g. `uvicorn run_asgi:asgi_app --port 5000`; see BufferedASGI
+asgi_app = BufferedASGI(WSGIMiddleware(app, workers=int(os.getenv('ASGI_WORKERS', 32))),
+                        max_body=int(os.getenv('ASGI_MAX_BODY', 4 * 1024 * 1024)),
+                        body_timeout=float(os.getenv('ASGI_BODY_TIMEOUT', 30)))
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(asgi_app, host="127.0.0.1", port=int(os.getenv('PORT', 5000)))
@@ -0,0 +1,44 @@
+import asyncio
+from application.asgi import BufferedASGI
+
+
+def run(middleware, messages, delay=0):
+    """Drive the middleware with the given request messages and return what it sent."""
+    incoming = list(messages)
+    sent = []
+
+    async def receive():
+        await asyncio.sleep(delay)
+        return incoming.pop(0) if incoming else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware({'type': 'http'}, receive, send))
+    return sent
+
+
+async def echo_app(scope, receive, send):
+    message = await receive()
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': message['body']})
+
+
+def test_body_is_buffered_before_the_app_runs():
+    sent = run(BufferedASGI(echo_app, max_body=100, body_timeout=1),
+               [{'type': 'http.request', 'body': b'ab', 'more_body': True},
+                {'type': 'http.request', 'body': b'cd', 'more_body': False}])
+    assert [m.get('status') for m in sent] == [200, None]
+    assert sent[1]['body'] == b'abcd'
+
+
+def test_large_body_is_rejected():
+    sent = run(BufferedASGI(echo_app, max_body=3, body_timeout=1),
+               [{'type': 'http.request', 'body': b'abcd', 'more_body': False}])
+    assert sent[0]['status'] == 413
+
+
+def test_slow_body_times_out():
+    sent = run(BufferedASGI(echo_app, max_body=100, body_timeout=0.05),
+               [{'type': 'http.request', 'body': b'a', 'more_body': True}] * 5, delay=0.02)
+    assert sent[0]['status'] == 408
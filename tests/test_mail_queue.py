@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import Future
+import pytest
+from flask import Flask
+from flask_mail import Message
+from application import app, limiter
+from application import routes
+from application.mail_queue import MailQueue
+from application.models_database import User
+
+
+class FakeMail:
+    """Stand-in for Flask-Mail that can be held or made to fail."""
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.release = threading.Event()
+        self.sent = []
+
+    def send(self, msg):
+        self.release.wait(5)
+        if self.fail:
+            raise OSError('SMTP down')
+        self.sent.append(msg)
+
+
+class FakeQuery:
+    """Stand-in for User.query serving a single user."""
+    def __init__(self, user):
+        self.user = user
+
+    def filter_by(self, **kwargs):
+        return self
+
+    def first(self):
+        return self.user
+
+
+def message(subject):
+    return Message(subject, sender='teachertrek2023@gmail.com', recipients=['t@x.com'])
+
+
+def make_queue(mailer, size=2):
+    test_app = Flask(__name__)
+    test_app.config.update(MAIL_WORKERS=1, MAIL_QUEUE_SIZE=size)
+    test_app.extensions['mail'] = mailer
+    return MailQueue(test_app)
+
+
+def test_queue_refuses_messages_beyond_its_size():
+    mailer = FakeMail()
+    queue = make_queue(mailer)
+    futures = [queue.submit(message(f'msg {i}')) for i in range(3)]
+    assert futures[2] is None
+    mailer.release.set()
+    for future in futures[:2]:
+        future.result(5)
+    assert [msg.subject for msg in mailer.sent] == ['msg 0', 'msg 1']
+    assert queue.stats() == {'refused': 1, 'sent': 2}
+
+
+def test_failed_delivery_is_counted_and_frees_its_slot():
+    mailer = FakeMail(fail=True)
+    mailer.release.set()
+    queue = make_queue(mailer, size=1)
+    future = queue.submit(message('msg'))
+    assert isinstance(future.exception(5), OSError)
+    assert queue.submit(message('retry')).exception(5) is not None
+    assert queue.stats() == {'failed': 2}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(app.config, 'SECRET_KEY', 'test')
+    monkeypatch.setitem(app.config, 'TESTING', True)
+    monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', False)
+    monkeypatch.setattr(limiter, 'limits', {})
+    user = User(id='0' * 36, username='teacher', email='t@x.com', password='$2b$12$' + 'a' * 53)
+    monkeypatch.setattr(User, 'query', FakeQuery(user))
+    return app.test_client()
+
+
+def test_reset_request_reports_full_queue(client, monkeypatch):
+    monkeypatch.setattr(routes.mail_queue, 'submit', lambda msg: None)
+    response = client.post('/reset_password', data={'email': 't@x.com'})
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/reset_password')
+    with client.session_transaction() as session:
+        assert session['_flashes'][0][0] == 'danger'
+
+
+def test_reset_request_queues_email(client, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(routes.mail_queue, 'submit', lambda msg: submitted.append(msg) or Future())
+    response = client.post('/reset_password', data={'email': 't@x.com'})
+    assert response.headers['Location'].endswith('/login')
+    assert submitted[0].recipients == ['t@x.com']
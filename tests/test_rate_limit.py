@@ -0,0 +1,120 @@
+import pytest
+from application import app, limiter
+from application.rate_limit import TokenBucketLimiter
+
+
+class Clock:
+    """Stand-in for time.time that only moves when told to."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr('application.rate_limit.time.time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def bucket_limiter(request, tmp_path):
+    storage = str(tmp_path / 'buckets.db') if request.param == 'sqlite' else None
+    test_app = type('App', (), {'config': {'RATELIMIT_STORAGE': storage}})
+    return TokenBucketLimiter(test_app)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(app.config, 'SECRET_KEY', 'test')
+    monkeypatch.setitem(app.config, 'TESTING', True)
+    monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', False)
+    monkeypatch.setattr(limiter, '_buckets', {})
+    monkeypatch.setattr(limiter, 'rejected', limiter.rejected.copy())
+    monkeypatch.setattr(limiter, 'storage', None)
+    return app.test_client()
+
+
+def test_bucket_empties_and_refills(clock, bucket_limiter):
+    assert [bucket_limiter.consume('k', 3, 60) for _ in range(4)] == [True, True, True, False]
+    clock.now += 20
+    assert bucket_limiter.consume('k', 3, 60)
+    assert not bucket_limiter.consume('k', 3, 60)
+    clock.now += 60
+    assert [bucket_limiter.consume('k', 3, 60) for _ in range(4)] == [True, True, True, False]
+
+
+def test_buckets_are_independent(clock, bucket_limiter):
+    assert bucket_limiter.consume('a', 1, 60)
+    assert not bucket_limiter.consume('a', 1, 60)
+    assert bucket_limiter.consume('b', 1, 60)
+
+
+def test_refilled_buckets_are_evicted(clock):
+    mem_limiter = TokenBucketLimiter()
+    mem_limiter.consume('old', 2, 60)
+    clock.now += 35
+    mem_limiter.consume('new', 2, 60)
+    clock.now += 26
+    mem_limiter.consume('newest', 2, 60)
+    assert set(mem_limiter._buckets) == {'new', 'newest'}
+
+
+def test_shared_rows_are_evicted(clock, tmp_path):
+    shared = TokenBucketLimiter(type('App', (), {'config': {'RATELIMIT_STORAGE': str(tmp_path / 'b.db')}}))
+    shared.consume('old', 2, 60)
+    clock.now += 61
+    shared.consume('new', 2, 60)
+    conn = shared._connect()
+    keys = {key for key, in conn.execute('SELECT key FROM rate_limit_bucket')}
+    conn.close()
+    assert keys == {'new'}
+
+
+def test_route_rejects_with_429_per_scope(clock, client, monkeypatch):
+    monkeypatch.setattr(limiter, 'limits', {'login': {'ip': (2, 60), 'email': (1, 60)}})
+    assert client.post('/login', data={'email': 'A@x.com'}).status_code == 200
+    assert client.post('/login', data={'email': ' a@x.com '}).status_code == 429
+    assert client.post('/login', data={'email': 'b@x.com'}).status_code == 200
+    assert client.post('/login', data={'email': 'c@x.com'}).status_code == 429
+    assert limiter.stats() == {'login:email': 1, 'login:ip': 1}
+
+
+def test_rejected_request_is_not_charged_to_other_scopes(clock, bucket_limiter):
+    assert bucket_limiter.consume('email', 1, 60)
+    assert bucket_limiter.consume_all([('ip', 2, 60), ('email', 1, 60)]) == 1
+    assert bucket_limiter.consume_all([('ip', 2, 60), ('email', 1, 60)]) == 1
+    assert bucket_limiter.consume('ip', 2, 60)
+    assert bucket_limiter.consume('ip', 2, 60)
+    assert not bucket_limiter.consume('ip', 2, 60)
+
+
+def test_locked_out_email_does_not_use_ip_allowance(clock, client, monkeypatch):
+    monkeypatch.setattr(limiter, 'limits', {'login': {'ip': (2, 60), 'email': (1, 60)}})
+    assert client.post('/login', data={'email': 'a@x.com'}).status_code == 200
+    for _ in range(3):
+        assert client.post('/login', data={'email': 'a@x.com'}).status_code == 429
+    assert client.post('/login', data={'email': 'b@x.com'}).status_code == 200
+
+
+def test_rejection_renders_site_page(clock, client, monkeypatch):
+    monkeypatch.setattr(limiter, 'limits', {'login': {'ip': (1, 60)}})
+    client.post('/login', data={})
+    response = client.post('/login', data={})
+    assert response.status_code == 429
+    assert b'Too many attempts' in response.data
+    assert b'Teacher' in response.data
+
+
+def test_get_is_not_limited(clock, client, monkeypatch):
+    monkeypatch.setattr(limiter, 'limits', {'login': {'ip': (1, 60)}})
+    for _ in range(3):
+        assert client.get('/login').status_code == 200
+
+
+def test_email_key_length_is_capped(clock, client, monkeypatch):
+    monkeypatch.setattr(limiter, 'limits', {'login': {'email': (5, 60)}})
+    client.post('/login', data={'email': 'a' * 10000})
+    assert max(len(key) for key in limiter._buckets) < 300
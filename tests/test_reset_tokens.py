@@ -0,0 +1,51 @@
+import pytest
+from application import app
+from application import reset_tokens
+from application.models_database import User
+
+
+class FakeQuery:
+    """Stand-in for User.query that records lookups."""
+    def __init__(self, user):
+        self.user = user
+        self.calls = 0
+
+    def get(self, user_id):
+        self.calls += 1
+        return self.user if user_id == self.user.id else None
+
+
+@pytest.fixture
+def user(monkeypatch):
+    monkeypatch.setitem(app.config, 'SECRET_KEY', 'test')
+    user = User(id='0' * 36, username='teacher', email='t@x.com', password='$2b$12$' + 'a' * 53)
+    monkeypatch.setattr(User, 'query', FakeQuery(user))
+    return user
+
+
+def test_valid_token_returns_user(user):
+    assert User.verify_token(user.get_reset_token()) is user
+
+
+def test_token_is_single_use(user):
+    token = user.get_reset_token()
+    user.password = '$2b$12$' + 'b' * 53
+    assert User.verify_token(token) is None
+
+
+def test_invalid_token_skips_database(user):
+    assert User.verify_token(user.get_reset_token()[:-4] + 'AAAA') is None
+    assert User.verify_token('garbage') is None
+    assert User.query.calls == 0
+
+
+def test_token_without_fingerprint_is_rejected(user):
+    legacy = reset_tokens.get_serialiser().dumps({'user_id': user.id}).decode('utf-8')
+    assert User.verify_token(legacy) is None
+    assert User.query.calls == 0
+
+
+def test_fingerprint_is_keyed(user, monkeypatch):
+    fingerprint = reset_tokens.password_fingerprint(user.password)
+    monkeypatch.setitem(app.config, 'SECRET_KEY', 'other')
+    assert reset_tokens.password_fingerprint(user.password) != fingerprint